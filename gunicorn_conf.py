@@ -0,0 +1,19 @@
+"""
+Gunicorn configuration for Stock Chart API
+
+The app is preloaded in the master so matplotlib/mplfinance imports and
+the warm-up render happen once and are shared with workers via fork.
+"""
+
+import os
+import multiprocessing
+
+# Warm up matplotlib at import time, before workers are forked
+os.environ.setdefault("PRELOAD_WARMUP", "true")
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+preload_app = True
+worker_class = "gthread"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+timeout = 120
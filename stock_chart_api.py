@@ -5,18 +5,34 @@ Flask API service for generating stock charts on-demand
 
 import os
 import io
+import re
+import time
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, Dict, Any
+from functools import lru_cache, wraps
+from typing import Optional, Dict, Any, BinaryIO
 
 from flask import Flask, request, jsonify, send_file
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
+import orjson
+import numpy as np
 import pandas as pd
 import matplotlib
 matplotlib.use('Agg')  # Non-interactive backend
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.figure import Figure
+from matplotlib.ticker import FuncFormatter
 import mplfinance as mpf
 import requests
+from requests.adapters import HTTPAdapter
 
 # ================== Configuration ==================
 logging.basicConfig(
@@ -25,12 +41,55 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson for faster jsonify()"""
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    
+    def loads(self, s, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)  # Enable CORS for ChatGPT access
 
 # Chart storage directory
 CHARTS_DIR = "generated_charts"
 os.makedirs(CHARTS_DIR, exist_ok=True)
+CHARTS_MAX_FILES = 500  # oldest charts are evicted beyond this
+
+# Accepted request values (anything else is rejected before calling Yahoo)
+VALID_PERIODS = frozenset({"1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "ytd", "max"})
+VALID_INTERVALS = frozenset({
+    "1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h", "1d", "5d", "1wk", "1mo", "3mo"
+})
+TICKER_RE = re.compile(r"^[A-Z0-9.\-^=]{1,15}$")
+MA_PARAM_RE = re.compile(r"^\s*\d+(?:\s*,\s*\d+)*\s*$")
+MA_RE = re.compile(r"\d+")
+MAX_MOVING_AVERAGES = 7
+MAX_MA_WINDOW = 500
+
+# Batch endpoint settings
+MAX_BATCH_TICKERS = 20
+BATCH_WORKERS = 10
+
+# Chart rendering pool settings
+RENDER_WORKERS = min(4, os.cpu_count() or 1)
+RENDER_TIMEOUT = 15  # seconds
+
+# Output image settings
+CHART_FORMATS = {"png": "image/png", "webp": "image/webp"}
+DEFAULT_DPI = 100
+MIN_DPI, MAX_DPI = 50, 200
+
+# Data cache settings (seconds)
+DATA_CACHE_MAXSIZE = 512
+INTRADAY_CACHE_TTL = 15
+DAILY_CACHE_TTL = 300  # daily and coarser bars (1d, 5d, 1wk, 1mo, 3mo)
+INTRADAY_INTERVALS = {"1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h"}
 
 
 # ================== Chart Style ==================
@@ -45,6 +104,11 @@ CHART_STYLE = mpf.make_mpf_style(
         "axes.labelsize": 10,
         "axes.titlesize": 12,
         "font.size": 9,
+        # One bundled font so text never goes through fallback resolution
+        "font.family": "DejaVu Sans",
+        # Server-side rendering: no font hinting.
+        # Kept in the style because applying it resets rcParams.
+        "text.hinting": "none",
     },
     marketcolors=mpf.make_marketcolors(
         up="#26a69a",
@@ -55,8 +119,283 @@ CHART_STYLE = mpf.make_mpf_style(
     )
 )
 
+# Apply CHART_STYLE to the global rcParams once, on the importing thread.
+# Chart figures are plain Figures built from those rcParams, so render
+# threads never go through mplfinance's per-figure style reset.
+plt.close(mpf.figure(style=CHART_STYLE))
+
+# Candle, wick, volume and MA line widths by number of bars
+# (mplfinance's own width table, interpolated by bar_widths)
+WIDTH_POINTS = (30, 60, 90, 120, 150, 180, 210, 240)
+CANDLE_WIDTHS = (0.65, 0.575, 0.50, 0.445, 0.435, 0.425, 0.420, 0.415)
+CANDLE_LINEWIDTHS = (1.00, 0.875, 0.75, 0.625, 0.500, 0.438, 0.435, 0.435)
+VOLUME_WIDTHS = (0.98, 0.96, 0.95, 0.925, 0.9, 0.9, 0.875, 0.825)
+LINE_WIDTHS = (2.25, 1.8, 1.3, 0.813, 0.807, 0.801, 0.796, 0.791)
+
+# Draw settings resolved from CHART_STYLE once at import, not per request
+PLOT_SETTINGS = {
+    "candle_up": CHART_STYLE["marketcolors"]["candle"]["up"],
+    "candle_down": CHART_STYLE["marketcolors"]["candle"]["down"],
+    "wick_up": CHART_STYLE["marketcolors"]["wick"]["up"],
+    "wick_down": CHART_STYLE["marketcolors"]["wick"]["down"],
+    "alpha": CHART_STYLE["marketcolors"]["alpha"],
+    "ma_colors": tuple(CHART_STYLE["mavcolors"] or (None,)),
+    "y_on_right": CHART_STYLE["y_on_right"],
+}
+
+
+@lru_cache(maxsize=256)
+def bar_widths(n: int) -> tuple:
+    """
+    (candle_width, candle_linewidth, volume_width, line_width) for n bars
+    """
+    return tuple(
+        float(np.interp(n, WIDTH_POINTS, table))
+        for table in (CANDLE_WIDTHS, CANDLE_LINEWIDTHS, VOLUME_WIDTHS, LINE_WIDTHS)
+    )
+
+
+# ================== HTTP Session ==================
+# Shared session keeps connections to Yahoo Finance alive across requests
+SESSION = requests.Session()
+SESSION.headers.update({
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+})
+SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=64))
+
+# Worker pool for fetching several tickers concurrently
+BATCH_POOL = ThreadPoolExecutor(max_workers=BATCH_WORKERS)
+
+# Bounded pool for CPU-bound chart rendering, separate from request threads
+RENDER_POOL = ThreadPoolExecutor(max_workers=RENDER_WORKERS)
+
+
+# Per-thread pool of reusable chart figures
+_figure_pool = threading.local()
+
+
+# ================== Data Cache ==================
+_data_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_data_cache_lock = threading.RLock()
+
+
+def cache_ttl(interval: str) -> int:
+    """
+    Seconds a fetched dataset stays fresh for the given interval
+    """
+    if interval in INTRADAY_INTERVALS:
+        return INTRADAY_CACHE_TTL
+    return DAILY_CACHE_TTL
+
+
+def data_age(df: pd.DataFrame) -> float:
+    """
+    Seconds since df was fetched from Yahoo (0 if it was never cached)
+    """
+    fetched_at = df.attrs.get("fetched_at")
+    if fetched_at is None:
+        return 0.0
+    return max(0.0, time.time() - fetched_at)
+
+
+def remaining_ttl(interval: str, age: float) -> int:
+    """
+    Seconds of freshness left for data that is age seconds old
+    """
+    return max(0, int(cache_ttl(interval) - age))
+
+
+def ttl_cache(func):
+    """
+    Cache DataFrames per (ticker, period, interval) with an LRU bound
+    and an interval-dependent expiry
+    
+    The wall-clock fetch time is kept in df.attrs["fetched_at"] so callers
+    can count HTTP and disk cache freshness from when the data was fetched.
+    """
+    @wraps(func)
+    def wrapper(ticker: str, period: str = "6mo", interval: str = "1d") -> pd.DataFrame:
+        key = (ticker.strip().upper(), period, interval)
+        now = time.monotonic()
+        
+        with _data_cache_lock:
+            entry = _data_cache.get(key)
+            if entry is not None:
+                expires, df = entry
+                if expires > now:
+                    _data_cache.move_to_end(key)
+                    return df.copy(deep=False)
+                del _data_cache[key]
+        
+        df = func(ticker, period, interval)
+        df.attrs["fetched_at"] = time.time()
+        
+        with _data_cache_lock:
+            _data_cache[key] = (now + cache_ttl(interval), df)
+            _data_cache.move_to_end(key)
+            while len(_data_cache) > DATA_CACHE_MAXSIZE:
+                _data_cache.popitem(last=False)
+        
+        return df.copy(deep=False)
+    
+    return wrapper
+
+
+def set_cache_headers(
+    response,
+    interval: str,
+    etag: Optional[str] = None,
+    max_age: Optional[int] = None
+):
+    """
+    Add Cache-Control and ETag headers and honour conditional requests
+    
+    max_age defaults to the full data TTL for the interval.
+    """
+    response.cache_control.no_cache = None
+    response.cache_control.public = True
+    response.cache_control.max_age = cache_ttl(interval) if max_age is None else max_age
+    if etag is not None:
+        response.set_etag(etag)
+    elif "ETag" not in response.headers:
+        response.add_etag()
+    return response.make_conditional(request)
+
+
+def chart_cache_path(
+    ticker: str,
+    period: str,
+    interval: str,
+    moving_averages: Optional[tuple],
+    show_volume: bool,
+    image_format: str,
+    dpi: int
+) -> str:
+    """
+    Path of the rendered chart for these parameters inside CHARTS_DIR
+    """
+    key = f"{ticker}|{period}|{interval}|{moving_averages}|{show_volume}|{dpi}"
+    name = hashlib.sha1(key.encode()).hexdigest()
+    return os.path.abspath(os.path.join(CHARTS_DIR, f"{name}.{image_format}"))
+
+
+def chart_age(path: str) -> Optional[float]:
+    """
+    Seconds since a rendered chart was written, or None if it is missing
+    """
+    try:
+        return time.time() - os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+@contextmanager
+def open_chart_file(path: str, mtime: Optional[float] = None):
+    """
+    Open a temp file that atomically replaces path once writing succeeds,
+    so readers never see partial charts
+    
+    mtime, if given, is stamped on the file before it replaces path.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            yield f
+        if mtime is not None:
+            os.utime(tmp_path, (mtime, mtime))
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+_prune_lock = threading.Lock()
+
+
+def prune_charts_dir():
+    """
+    Bound CHARTS_DIR: drop files past the longest TTL, then evict the
+    oldest by mtime until at most CHARTS_MAX_FILES remain
+    """
+    if not _prune_lock.acquire(blocking=False):
+        return  # another render thread is already pruning
+    try:
+        now = time.time()
+        entries = []
+        for entry in os.scandir(CHARTS_DIR):
+            try:
+                mtime = entry.stat().st_mtime
+            except OSError:
+                continue
+            entries.append((mtime, entry.path))
+        
+        # Newest first; in-progress temp files only ever expire by age
+        entries.sort(reverse=True)
+        kept = 0
+        for mtime, path in entries:
+            expired = now - mtime > DAILY_CACHE_TTL
+            if not expired and path.endswith(".tmp"):
+                continue
+            if not expired and kept < CHARTS_MAX_FILES:
+                kept += 1
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    finally:
+        _prune_lock.release()
+
+
+# ================== Numeric Kernels ==================
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Simple moving average in O(n) via a running sum
+    
+    The first window-1 entries are NaN, matching pandas' rolling().mean().
+    """
+    values = np.asarray(values, dtype="float64")
+    out = np.full(values.shape, np.nan)
+    if 0 < window <= len(values):
+        csum = np.cumsum(np.concatenate(([0.0], values)))
+        out[window - 1:] = (csum[window:] - csum[:-window]) / window
+    return out
+
+
+def price_change(close: np.ndarray) -> tuple:
+    """
+    Absolute and percent change of the last close versus the previous one
+    """
+    last = close[-1]
+    previous = close[-2] if len(close) > 1 else last
+    change = last - previous
+    return change, (change / previous) * 100
+
 
 # ================== Helper Functions ==================
+def parse_chart_response(raw: bytes) -> tuple:
+    """
+    Decode a Yahoo chart response into (timestamps, columns) arrays
+    
+    Each list goes straight to its final dtype in one C-level conversion:
+    int64 epoch seconds, float32 prices (Yahoo serves float32-precision
+    values, so nothing is lost) and float64 volume so gaps stay NaN until
+    dropna(). None entries become NaN.
+    """
+    result = orjson.loads(raw)["chart"]["result"][0]
+    quote = result["indicators"]["quote"][0]
+    
+    timestamps = np.asarray(result["timestamp"], dtype="int64")
+    columns = {
+        name.title(): np.asarray(quote[name], dtype="float32")
+        for name in ("open", "high", "low", "close")
+    }
+    columns["Volume"] = np.asarray(quote["volume"], dtype="float64")
+    
+    return timestamps, columns
+
+
+@ttl_cache
 def fetch_stock_data(ticker: str, period: str = "6mo", interval: str = "1d") -> pd.DataFrame:
     """
     Fetch OHLCV data from Yahoo Finance
@@ -80,30 +419,23 @@ def fetch_stock_data(ticker: str, period: str = "6mo", interval: str = "1d") ->
         "includeAdjustedClose": "true"
     }
     
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
-    }
-    
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=10)
+        response = SESSION.get(url, params=params, timeout=10)
         response.raise_for_status()
-        data = response.json()
-        
-        result = data["chart"]["result"][0]
-        timestamps = result["timestamp"]
-        quote = result["indicators"]["quote"][0]
-        
-        df = pd.DataFrame({
-            "Open": quote["open"],
-            "High": quote["high"],
-            "Low": quote["low"],
-            "Close": quote["close"],
-            "Volume": quote["volume"],
-        })
+        timestamps, columns = parse_chart_response(response.content)
         
-        df.index = pd.to_datetime([datetime.fromtimestamp(ts) for ts in timestamps])
+        df = pd.DataFrame(
+            columns,
+            index=pd.to_datetime(timestamps, unit="s", utc=True).tz_convert(None),
+            copy=False,
+        )
         df = df.dropna()
         
+        # Volume only drops to int32 when every value fits
+        volume_dtype = "int32" if df["Volume"].max() <= np.iinfo(np.int32).max else "int64"
+        df = df.astype({"Volume": volume_dtype})
+        df = df.copy()  # consolidate into one float block and one int block
+        
         if df.empty:
             raise ValueError(f"No data available for {ticker}")
         
@@ -114,71 +446,296 @@ def fetch_stock_data(ticker: str, period: str = "6mo", interval: str = "1d") ->
         raise
 
 
-def generate_chart_image(
-    ticker: str,
-    period: str = "6mo",
-    interval: str = "1d",
-    moving_averages: tuple = (20, 50),
-    show_volume: bool = True
-) -> io.BytesIO:
+def new_chart_figure(show_volume: bool = True) -> tuple:
+    """
+    Build a (fig, ax_price, ax_vol) chart layout outside pyplot
+    
+    ax_vol is None for the price-only layout.
+    """
+    fig = Figure(figsize=(12, 6))
+    FigureCanvasAgg(fig)
+    if show_volume:
+        ax_price, ax_vol = fig.subplots(
+            2, 1,
+            sharex=True,
+            gridspec_kw={"height_ratios": [3, 1]}
+        )
+    else:
+        ax_price, ax_vol = fig.subplots(), None
+    # Fixed margins replace a per-save bbox_inches="tight" pass
+    fig.subplots_adjust(left=0.05, right=0.92, top=0.9, bottom=0.17, hspace=0.12)
+    return fig, ax_price, ax_vol
+
+
+def get_chart_figure(show_volume: bool = True) -> Dict[str, Any]:
+    """
+    Return this thread's reusable figure entry for the layout
+    
+    Figures are created once per thread and layout, then reused so the
+    Agg renderer, fonts and tick machinery are not rebuilt per request.
+    The entry holds fig, ax_price and ax_vol (None for the price-only
+    layout), plus data_key and ma_lines describing what is drawn on it.
+    """
+    figures = getattr(_figure_pool, "figures", None)
+    if figures is None:
+        figures = _figure_pool.figures = {}
+    
+    if show_volume not in figures:
+        fig, ax_price, ax_vol = new_chart_figure(show_volume)
+        figures[show_volume] = {
+            "fig": fig,
+            "ax_price": ax_price,
+            "ax_vol": ax_vol,
+            "data_key": None,
+            "ma_lines": [],
+        }
+    
+    return figures[show_volume]
+
+
+def date_format(index: pd.DatetimeIndex) -> str:
+    """
+    Pick a tick label format from the bar spacing and date range
+    """
+    if len(index) > 1 and (index[-1] - index[0]) / len(index) < pd.Timedelta(hours=8):
+        if index[-1].date() != index[0].date():
+            return "%b %d, %H:%M"
+        return "%H:%M"
+    if index[-1].year != index[0].year:
+        return "%Y-%b-%d"
+    return "%b %d"
+
+
+def draw_candles(ax, x: np.ndarray, ohlc: np.ndarray, colors: np.ndarray):
+    """
+    Draw all wicks as one LineCollection and all bodies as one PolyCollection
+    """
+    opens, highs, lows, closes = ohlc
+    candle_width, linewidth, _, _ = bar_widths(len(x))
+    width = candle_width / 2
+    
+    up = closes >= opens
+    bottoms = np.minimum(opens, closes)
+    tops = np.maximum(opens, closes)
+    
+    # (n, 2, 2) segments low -> high
+    wicks = np.stack([np.column_stack([x, lows]), np.column_stack([x, highs])], axis=1)
+    # (n, 4, 2) rectangles
+    bodies = np.array([
+        [x - width, bottoms],
+        [x - width, tops],
+        [x + width, tops],
+        [x + width, bottoms],
+    ]).transpose(2, 0, 1)
+    
+    ax.add_collection(LineCollection(
+        wicks,
+        colors=np.where(up, PLOT_SETTINGS["wick_up"], PLOT_SETTINGS["wick_down"]),
+        linewidths=linewidth,
+    ))
+    ax.add_collection(PolyCollection(
+        bodies,
+        facecolors=colors,
+        edgecolors=colors,
+        linewidths=linewidth,
+        alpha=PLOT_SETTINGS["alpha"],
+    ))
+    
+    # Same limits logic as mplfinance: small margin around the data
+    ax.update_datalim([(x[0] - 0.45, np.nanmin(lows)), (x[-1] + 0.45, np.nanmax(highs))])
+    ax.autoscale_view()
+
+
+def draw_moving_averages(ax, x: np.ndarray, closes: np.ndarray, moving_averages: Optional[tuple]):
+    """
+    Overlay simple moving averages of the close and return their lines
+    """
+    colors = PLOT_SETTINGS["ma_colors"]
+    linewidth = bar_widths(len(x))[3]
+    lines = []
+    for i, ma in enumerate(moving_averages or ()):
+        lines += ax.plot(x, rolling_mean(closes, ma), color=colors[i % len(colors)], linewidth=linewidth)
+    return lines
+
+
+def draw_volume(ax, x: np.ndarray, volumes: np.ndarray, colors: np.ndarray):
+    """
+    Draw volume bars coloured like their candles
+    """
+    width = bar_widths(len(x))[2]
+    ax.bar(x, volumes, width=width, color=colors, linewidth=0)
+    ax.set_ylim(0.3 * volumes.min(), 1.1 * volumes.max())
+    ax.set_ylabel("Volume")
+
+
+def draw_chart(ax_price, ax_vol, df: pd.DataFrame, moving_averages: Optional[tuple]):
     """
-    Generate candlestick chart and return as BytesIO
+    Draw candles, moving averages and optional volume onto cleared axes
+    
+    Bars are plotted at integer positions (no gaps for non-trading days)
+    and labelled with their dates.
     """
-    df = fetch_stock_data(ticker, period, interval)
+    x = np.arange(len(df), dtype="float64")
+    ohlc = df[["Open", "High", "Low", "Close"]].to_numpy().T
+    colors = np.where(
+        ohlc[3] >= ohlc[0], PLOT_SETTINGS["candle_up"], PLOT_SETTINGS["candle_down"]
+    )
     
-    # Chart title
+    draw_candles(ax_price, x, ohlc, colors)
+    draw_moving_averages(ax_price, x, ohlc[3], moving_averages)
+    ax_price.set_ylabel("Price (USD)")
+    
+    labels = df.index.strftime(date_format(df.index))
+    formatter = FuncFormatter(
+        lambda value, pos: labels[int(round(value))] if 0 <= round(value) < len(labels) else ""
+    )
+    
+    axes = [ax_price]
+    if ax_vol is not None:
+        draw_volume(ax_vol, x, df["Volume"].to_numpy(), colors)
+        axes.append(ax_vol)
+    
+    for ax in axes:
+        ax.set_axisbelow(True)
+        ax.xaxis.set_major_formatter(formatter)
+        ax.tick_params(axis="x", rotation=45)
+        if PLOT_SETTINGS["y_on_right"]:
+            ax.yaxis.tick_right()
+            ax.yaxis.set_label_position("right")
+
+
+@lru_cache(maxsize=64)
+def parse_moving_averages(ma_param: str) -> Optional[tuple]:
+    """
+    Parse the ma parameter, e.g. "20,50" -> (20, 50); empty means none
+    
+    Raises ValueError for anything but up to MAX_MOVING_AVERAGES
+    comma-separated windows between 1 and MAX_MA_WINDOW.
+    """
+    if not ma_param:
+        return None
+    if not MA_PARAM_RE.match(ma_param):
+        raise ValueError(f"Invalid moving averages '{ma_param}'")
+    windows = tuple(int(x) for x in MA_RE.findall(ma_param))
+    if len(windows) > MAX_MOVING_AVERAGES or not all(1 <= w <= MAX_MA_WINDOW for w in windows):
+        raise ValueError(f"Invalid moving averages '{ma_param}'")
+    return windows
+
+
+def chart_title(ticker: str, period: str, interval: str, moving_averages: Optional[tuple]) -> str:
+    """
+    Build the chart title, e.g. "TSLA | 6mo | 1d | MA20, MA50"
+    """
     title = f"{ticker} | {period} | {interval}"
     if moving_averages:
         ma_str = ", ".join([f"MA{ma}" for ma in moving_averages])
         title += f" | {ma_str}"
+    return title
+
+
+def render_chart(
+    df: pd.DataFrame,
+    title: str,
+    output: BinaryIO,
+    moving_averages: Optional[tuple] = (20, 50),
+    show_volume: bool = True,
+    image_format: str = "png",
+    dpi: int = DEFAULT_DPI
+):
+    """
+    Render candlestick chart for df and encode it straight into output
+    
+    image_format is one of CHART_FORMATS; WebP is encoded through Pillow.
+    """
+    entry = get_chart_figure(show_volume)
+    fig, ax_price, ax_vol = entry["fig"], entry["ax_price"], entry["ax_vol"]
+    
+    # Candles and volume only need redrawing when the data changed; for a
+    # repeat of the same data just swap the moving average overlay
+    data_key = int(pd.util.hash_pandas_object(df).sum())
+    if entry["data_key"] == data_key:
+        for line in entry["ma_lines"]:
+            line.remove()
+        entry["ma_lines"] = []
+    else:
+        entry["data_key"] = None
+        ax_price.cla()
+        if ax_vol is not None:
+            ax_vol.cla()
+        draw_chart(ax_price, ax_vol, df, None)
+        entry["data_key"] = data_key
     
-    # Create chart
-    fig, axes = mpf.plot(
-        df,
-        type="candle",
-        volume=show_volume,
-        mav=moving_averages,
-        style=CHART_STYLE,
-        title=title,
-        figsize=(12, 6),
-        returnfig=True,
-        ylabel="Price (USD)",
-        ylabel_lower="Volume",
+    entry["ma_lines"] = draw_moving_averages(
+        ax_price, np.arange(len(df), dtype="float64"), df["Close"].to_numpy(), moving_averages
     )
+    fig.suptitle(title)
     
-    # Save to BytesIO
-    buf = io.BytesIO()
-    fig.savefig(buf, format="png", bbox_inches="tight", dpi=150)
-    buf.seek(0)
-    plt.close(fig)
+    # Encode into the output (the figure stays open for the next request)
+    fig.savefig(
+        output,
+        format=image_format,
+        dpi=dpi,
+        pil_kwargs={"quality": 85, "method": 4} if image_format == "webp" else None
+    )
+
+
+def render_chart_file(path: str, df: pd.DataFrame, title: str, **kwargs):
+    """
+    Render a chart into the cache file at path (runs on RENDER_POOL)
     
-    return buf
+    The job owns the file, so a request that stops waiting on it still
+    leaves a complete chart in the cache.
+    """
+    # The file's mtime is the data's fetch time, so chart_age is data age
+    with open_chart_file(path, mtime=df.attrs.get("fetched_at")) as chart_file:
+        render_chart(df, title, chart_file, **kwargs)
+    prune_charts_dir()
 
 
 def get_stock_info(ticker: str) -> Dict[str, Any]:
     """
     Get latest stock price and information
     """
-    df = fetch_stock_data(ticker, period="5d", interval="1d")
-    latest = df.iloc[-1]
-    previous = df.iloc[-2] if len(df) > 1 else latest
-    
-    change = latest["Close"] - previous["Close"]
-    change_percent = (change / previous["Close"]) * 100
+    return summarize_quote(ticker, fetch_stock_data(ticker, period="5d", interval="1d"))
+
+
+def summarize_quote(ticker: str, df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Latest price, change and volume from a fetched OHLCV frame
+    """
+    # Read scalars straight from the arrays instead of building row Series
+    prices = df[["Open", "High", "Low", "Close"]].to_numpy()
+    open_, high, low, close = prices[-1]
+    change, change_percent = price_change(prices[:, 3])
+    volume = df["Volume"].to_numpy()[-1]
+    date = np.datetime_as_string(df.index.values[-1], unit="s").replace("T", " ")
     
     return {
         "ticker": ticker,
-        "price": round(float(latest["Close"]), 2),
+        "price": round(float(close), 2),
         "change": round(float(change), 2),
         "change_percent": round(float(change_percent), 2),
-        "volume": int(latest["Volume"]),
-        "high": round(float(latest["High"]), 2),
-        "low": round(float(latest["Low"]), 2),
-        "open": round(float(latest["Open"]), 2),
-        "date": latest.name.strftime("%Y-%m-%d %H:%M:%S")
+        "volume": int(volume),
+        "high": round(float(high), 2),
+        "low": round(float(low), 2),
+        "open": round(float(open_), 2),
+        "date": date
     }
 
 
+def get_batch_info(tickers: list) -> list:
+    """
+    Get stock information for several tickers concurrently
+    """
+    def fetch(ticker: str) -> Dict[str, Any]:
+        try:
+            return get_stock_info(ticker)
+        except Exception as e:
+            return {"ticker": ticker, "error": str(e)}
+    
+    return list(BATCH_POOL.map(fetch, tickers))
+
+
 # ================== API Endpoints ==================
 
 @app.route('/', methods=['GET'])
@@ -190,25 +747,40 @@ def home():
         "endpoints": {
             "/chart": "Generate stock chart (GET)",
             "/info": "Get stock information (GET)",
+            "/batch": "Get information for several stocks (GET)",
             "/health": "Health check (GET)"
         },
         "parameters": {
             "ticker": "Stock symbol (required)",
             "period": "Time period (optional, default: 6mo)",
             "interval": "Data interval (optional, default: 1d)",
-            "ma": "Moving averages (optional, e.g., 20,50,200)"
+            "ma": "Moving averages (optional, e.g., 20,50,200)",
+            "format": "Image format (optional, png or webp, default: png)",
+            "dpi": "Image resolution (optional, default: 100)"
         },
         "example": "/chart?ticker=TSLA&period=3mo&ma=20,50"
     })
 
 
-@app.route('/health', methods=['GET'])
-def health_check():
-    """Health check endpoint"""
-    return jsonify({
+def health_payload() -> Dict[str, Any]:
+    """Body of the /health response"""
+    return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat()
-    })
+    }
+
+
+@app.before_request
+def fast_health_check():
+    """Answer GET /health polls before URL dispatch, logging or the view stack"""
+    if request.method == 'GET' and request.path == '/health':
+        return orjson.dumps(health_payload()), 200, {"Content-Type": "application/json"}
+
+
+@app.route('/health', methods=['GET'])
+def health_check():
+    """Health check endpoint (GET is answered by fast_health_check)"""
+    return jsonify(health_payload())
 
 
 @app.route('/chart', methods=['GET'])
@@ -222,9 +794,11 @@ def get_chart():
         - interval (optional): Data interval (default: 1d)
         - ma (optional): Moving averages, comma-separated (e.g., 20,50,200)
         - volume (optional): Show volume (true/false, default: true)
+        - format (optional): Image format (png/webp, default: png)
+        - dpi (optional): Image resolution (50-200, default: 100)
     
     Returns:
-        PNG image of the chart
+        PNG or WebP image of the chart
     """
     try:
         # Get parameters
@@ -235,40 +809,93 @@ def get_chart():
                 "example": "/chart?ticker=TSLA"
             }), 400
         
+        if not TICKER_RE.match(ticker):
+            return jsonify({
+                "error": f"Invalid ticker '{ticker}'",
+                "example": "/chart?ticker=TSLA"
+            }), 400
+        
         period = request.args.get('period', '6mo')
         interval = request.args.get('interval', '1d')
+        
+        if period not in VALID_PERIODS:
+            return jsonify({
+                "error": f"Invalid period '{period}'",
+                "valid_periods": sorted(VALID_PERIODS)
+            }), 400
+        
+        if interval not in VALID_INTERVALS:
+            return jsonify({
+                "error": f"Invalid interval '{interval}'",
+                "valid_intervals": sorted(VALID_INTERVALS)
+            }), 400
+        
         ma_param = request.args.get('ma', '20,50')
         show_volume = request.args.get('volume', 'true').lower() == 'true'
+        image_format = request.args.get('format', 'png').lower()
+        
+        if image_format not in CHART_FORMATS:
+            return jsonify({
+                "error": f"Invalid format '{image_format}'",
+                "valid_formats": list(CHART_FORMATS)
+            }), 400
+        
+        try:
+            dpi = int(request.args.get('dpi', DEFAULT_DPI))
+        except ValueError:
+            dpi = None
+        if dpi is None or not MIN_DPI <= dpi <= MAX_DPI:
+            return jsonify({
+                "error": f"Invalid dpi, must be an integer between {MIN_DPI} and {MAX_DPI}",
+                "example": "dpi=100"
+            }), 400
         
         # Parse moving averages
-        moving_averages = None
-        if ma_param:
-            try:
-                moving_averages = tuple(int(x.strip()) for x in ma_param.split(','))
-            except ValueError:
-                return jsonify({
-                    "error": "Invalid moving averages format",
-                    "example": "ma=20,50,200"
-                }), 400
-        
-        logger.info(f"Generating chart for {ticker} ({period}, {interval})")
-        
-        # Generate chart
-        chart_buffer = generate_chart_image(
-            ticker=ticker,
-            period=period,
-            interval=interval,
-            moving_averages=moving_averages,
-            show_volume=show_volume
+        try:
+            moving_averages = parse_moving_averages(ma_param)
+        except ValueError:
+            return jsonify({
+                "error": (
+                    f"Invalid moving averages, use up to {MAX_MOVING_AVERAGES} "
+                    f"comma-separated windows between 1 and {MAX_MA_WINDOW}"
+                ),
+                "example": "ma=20,50,200"
+            }), 400
+        
+        chart_path = chart_cache_path(
+            ticker, period, interval, moving_averages, show_volume, image_format, dpi
         )
         
-        # Return image
-        return send_file(
-            chart_buffer,
-            mimetype='image/png',
+        age = chart_age(chart_path)
+        if age is not None and age < cache_ttl(interval):
+            logger.info(f"Serving cached chart for {ticker} ({period}, {interval})")
+        else:
+            logger.info(f"Generating chart for {ticker} ({period}, {interval})")
+            
+            # Fetch on this thread, render on the dedicated render pool
+            df = fetch_stock_data(ticker, period, interval)
+            future = RENDER_POOL.submit(
+                render_chart_file,
+                chart_path,
+                df,
+                chart_title(ticker, period, interval, moving_averages),
+                moving_averages=moving_averages,
+                show_volume=show_volume,
+                image_format=image_format,
+                dpi=dpi
+            )
+            future.result(timeout=RENDER_TIMEOUT)
+            age = data_age(df)
+        
+        # Return image (send_file adds Last-Modified and an ETag for the file)
+        response = send_file(
+            chart_path,
+            mimetype=CHART_FORMATS[image_format],
             as_attachment=False,
-            download_name=f'{ticker}_chart.png'
+            download_name=f'{ticker}_chart.{image_format}'
         )
+        # Clients may only cache for the data's remaining freshness
+        return set_cache_headers(response, interval, max_age=remaining_ttl(interval, age))
         
     except ValueError as e:
         logger.error(f"Data error: {e}")
@@ -304,10 +931,18 @@ def get_info():
                 "example": "/info?ticker=TSLA"
             }), 400
         
+        if not TICKER_RE.match(ticker):
+            return jsonify({
+                "error": f"Invalid ticker '{ticker}'",
+                "example": "/info?ticker=TSLA"
+            }), 400
+        
         logger.info(f"Getting info for {ticker}")
         
-        info = get_stock_info(ticker)
-        return jsonify(info)
+        df = fetch_stock_data(ticker, period="5d", interval="1d")
+        info = summarize_quote(ticker, df)
+        # Clients may only cache for the quote's remaining freshness
+        return set_cache_headers(jsonify(info), "1d", max_age=remaining_ttl("1d", data_age(df)))
         
     except ValueError as e:
         logger.error(f"Data error: {e}")
@@ -324,11 +959,57 @@ def get_info():
         }), 500
 
 
+@app.route('/batch', methods=['GET'])
+def get_batch():
+    """
+    Get stock information for several tickers at once
+    
+    Query Parameters:
+        - tickers (required): Comma-separated stock symbols (e.g., AAPL,TSLA,MSFT)
+    
+    Returns:
+        JSON with stock information per ticker
+    """
+    try:
+        tickers_param = request.args.get('tickers', '')
+        tickers = list(dict.fromkeys(
+            t.strip().upper() for t in tickers_param.split(',') if t.strip()
+        ))
+        if not tickers:
+            return jsonify({
+                "error": "Missing required parameter 'tickers'",
+                "example": "/batch?tickers=AAPL,TSLA,MSFT"
+            }), 400
+        
+        if len(tickers) > MAX_BATCH_TICKERS:
+            return jsonify({
+                "error": f"Too many tickers, maximum is {MAX_BATCH_TICKERS}"
+            }), 400
+        
+        invalid = [t for t in tickers if not TICKER_RE.match(t)]
+        if invalid:
+            return jsonify({
+                "error": "Invalid tickers",
+                "tickers": invalid
+            }), 400
+        
+        logger.info(f"Getting batch info for {len(tickers)} tickers")
+        
+        return jsonify({"results": get_batch_info(tickers)})
+        
+    except Exception as e:
+        logger.error(f"Unexpected error: {e}")
+        return jsonify({
+            "error": "Internal server error",
+            "message": str(e)
+        }), 500
+
+
 @app.errorhandler(404)
 def not_found(e):
     return jsonify({
         "error": "Endpoint not found",
-        "available_endpoints": ["/", "/chart", "/info", "/health"]
+        "available_endpoints": ["/", "/chart", "/info", "/batch", "/health"]
     }), 404
 
 
@@ -339,6 +1020,32 @@ def server_error(e):
     }), 500
 
 
+# ================== Warm-up ==================
+def warm_up():
+    """
+    Render a throwaway chart so fonts, tick machinery and the Agg renderer
+    are set up once, e.g. in the gunicorn master before workers fork
+    """
+    df = pd.DataFrame(
+        {
+            "Open": [1.0, 2.0],
+            "High": [2.0, 3.0],
+            "Low": [0.5, 1.5],
+            "Close": [1.5, 2.5],
+            "Volume": [100, 200],
+        },
+        index=pd.date_range("2024-01-01", periods=2, freq="D"),
+    )
+    fig, ax_price, ax_vol = new_chart_figure()
+    draw_chart(ax_price, ax_vol, df, (2,))
+    fig.savefig(io.BytesIO(), format="png")
+
+
+if os.environ.get('PRELOAD_WARMUP', 'False').lower() == 'true':
+    logger.info("Warming up matplotlib")
+    warm_up()
+
+
 # ================== Main ==================
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))